@@ -0,0 +1,64 @@
+# bench_startup.py
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import requests
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_cold_start(timeout: float = 60.0) -> tuple[float, float]:
+    """
+    启动一个全新的 uvicorn 进程，返回两个从启动进程开始计算的秒数：
+    第一个 /get_languages（不访问数据库）成功响应的时间，
+    以及随后第一个 /search（需要数据库连接）成功响应的时间。
+    """
+    port = find_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn 进程提前退出，返回码 {proc.returncode}")
+            try:
+                response = requests.get(f"{base_url}/get_languages", timeout=1)
+                if response.status_code == 200:
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.01)
+        else:
+            raise TimeoutError(f"{timeout} 秒内未收到成功响应。")
+        first_response = time.perf_counter() - started
+
+        response = requests.get(f"{base_url}/search", params={"query": "x"}, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"/search 返回状态码 {response.status_code}")
+        first_db_response = time.perf_counter() - started
+        return first_response, first_db_response
+    finally:
+        proc.terminate()
+        proc.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="测量 API 从冷启动到第一个请求的耗时。")
+    parser.add_argument("--runs", type=int, default=5, help="重复测量的次数。")
+    args = parser.parse_args()
+
+    first_results, db_results = [], []
+    for i in range(args.runs):
+        first_response, first_db_response = measure_cold_start()
+        first_results.append(first_response)
+        db_results.append(first_db_response)
+        print(f"  - 第 {i + 1} 次: /get_languages {first_response * 1000:.0f} ms, /search {first_db_response * 1000:.0f} ms")
+
+    for label, results in (("/get_languages", first_results), ("/search（含数据库连接）", db_results)):
+        print(f"\n冷启动到首个 {label} 响应: 最小 {min(results) * 1000:.0f} ms, 中位数 {statistics.median(results) * 1000:.0f} ms, 最大 {max(results) * 1000:.0f} ms")
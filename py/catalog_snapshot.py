@@ -0,0 +1,162 @@
+# catalog_snapshot.py
+import argparse
+import datetime
+import io
+import time
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+from database import SessionLocal, SteamGame, get_engine, create_db_and_tables
+from languages import LANGUAGE_CODE_TO_NAME
+
+CHUNK_SIZE = 50_000
+
+# steam_games 表在快照文件中的列定义（顺序即 Parquet 列顺序）
+CATALOG_SCHEMA = pa.schema([
+    ("app_id", pa.int32()),
+    ("name", pa.string()),
+    ("type", pa.string()),
+    ("tags", pa.string()),
+    ("supported_languages", pa.string()),
+    ("language_reviews", pa.string()),
+    ("last_scanned", pa.timestamp("us", tz="UTC")),
+    ("total_reviews_all_purchase_types", pa.int32()),
+    ("total_reviews_steam_purchase_only", pa.int32()),
+])
+CATALOG_COLUMNS = CATALOG_SCHEMA.names
+
+
+def export_catalog(path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    以服务端游标分块读取 steam_games，并逐块写入 zstd 压缩的 Parquet 文件。
+    内存占用只与 chunk_size 有关。返回导出的行数。
+    """
+    db: Session = SessionLocal()
+    total = 0
+    try:
+        query = db.query(*[getattr(SteamGame, c) for c in CATALOG_COLUMNS]).order_by(SteamGame.app_id).yield_per(chunk_size)
+        with pq.ParquetWriter(path, CATALOG_SCHEMA, compression="zstd") as writer:
+            chunk = []
+            for row in query:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    writer.write_batch(_rows_to_batch(chunk))
+                    total += len(chunk)
+                    print(f"  - 已导出 {total} 行...")
+                    chunk = []
+            if chunk:
+                writer.write_batch(_rows_to_batch(chunk))
+                total += len(chunk)
+    finally:
+        db.close()
+    return total
+
+
+def _rows_to_batch(rows: list) -> pa.RecordBatch:
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(CATALOG_SCHEMA, columns):
+        if field.name == "last_scanned":
+            # 快照中统一存 UTC：带时区的值先换算到 UTC，不带时区的值按 UTC 解释。
+            # 写出的 CSV 带 "Z" 后缀，COPY 不会再按目标会话的时区解释。
+            values = [
+                v.astimezone(datetime.timezone.utc) if v is not None and v.tzinfo else
+                v.replace(tzinfo=datetime.timezone.utc) if v is not None else None
+                for v in values
+            ]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=CATALOG_SCHEMA)
+
+
+def import_catalog(path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    分块读取 Parquet 快照，通过 COPY 批量写入临时表，再 upsert 到 steam_games。
+    已存在的 app_id 会被快照中的数据覆盖。返回导入的行数。仅支持 PostgreSQL。
+    """
+    column_list = ", ".join(CATALOG_COLUMNS)
+    update_list = ", ".join(f"{c} = EXCLUDED.{c}" for c in CATALOG_COLUMNS if c != "app_id")
+    parquet_file = pq.ParquetFile(path)
+
+    conn = get_engine().raw_connection()
+    total = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE TEMP TABLE steam_games_import (LIKE {SteamGame.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP")
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=CATALOG_COLUMNS):
+            buffer = io.BytesIO()
+            pa_csv.write_csv(batch, buffer)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY steam_games_import ({column_list}) FROM STDIN WITH (FORMAT csv, HEADER true)", buffer)
+            cursor.execute(
+                f"INSERT INTO {SteamGame.__tablename__} ({column_list}) SELECT {column_list} FROM steam_games_import "
+                f"ON CONFLICT (app_id) DO UPDATE SET {update_list}"
+            )
+            cursor.execute("TRUNCATE steam_games_import")
+            total += batch.num_rows
+            print(f"  - 已导入 {total} 行...")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return total
+
+
+def read_catalog(path: str, columns: list[str] | None = None) -> pa.Table:
+    """离线读取快照文件，返回 pyarrow Table（可直接转为 pandas / 交给 DuckDB）。"""
+    return pq.read_table(path, columns=columns)
+
+
+def analyze_tags_offline(path: str, tags: list[str], language: str) -> dict:
+    """
+    与 /analyze_by_tags 相同的对比逻辑，但直接在快照文件上运行，不需要数据库。
+    """
+    language_fullname = LANGUAGE_CODE_TO_NAME.get(language, language).lower()
+    user_tags = set(tags)
+    with_lang, without_lang = [], []
+
+    parquet_file = pq.ParquetFile(path)
+    columns = ["type", "tags", "supported_languages", "total_reviews_all_purchase_types"]
+    for batch in parquet_file.iter_batches(batch_size=CHUNK_SIZE, columns=columns):
+        data = batch.to_pydict()
+        for app_type, game_tags, languages, total in zip(*(data[c] for c in columns)):
+            if app_type not in ('game', 'demo') or not game_tags or (total or 0) <= 10:
+                continue
+            if not user_tags.intersection(game_tags.split(',')):
+                continue
+            if language_fullname in (languages or "").lower():
+                with_lang.append(total)
+            else:
+                without_lang.append(total)
+
+    return {
+        "tags": tags,
+        "language": language,
+        "games_with_language": len(with_lang),
+        "games_without_language": len(without_lang),
+        "avg_reviews_with_language": round(sum(with_lang) / len(with_lang)) if with_lang else 0,
+        "avg_reviews_without_language": round(sum(without_lang) / len(without_lang)) if without_lang else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出/导入 steam_games 目录快照（zstd 压缩的 Parquet 文件）。")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="将 steam_games 导出为快照文件。")
+    export_parser.add_argument("path", help="输出的 .parquet 文件路径。")
+    import_parser = subparsers.add_parser("import", help="从快照文件导入 steam_games。")
+    import_parser.add_argument("path", help="要导入的 .parquet 文件路径。")
+    for sub in (export_parser, import_parser):
+        sub.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="每个分块的行数。")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "export":
+        count = export_catalog(args.path, chunk_size=args.chunk_size)
+        print(f"\n导出完成：{count} 行 -> {args.path}，耗时 {time.perf_counter() - started:.1f} 秒。")
+    else:
+        create_db_and_tables()
+        count = import_catalog(args.path, chunk_size=args.chunk_size)
+        print(f"\n导入完成：{count} 行 <- {args.path}，耗时 {time.perf_counter() - started:.1f} 秒。")
@@ -7,12 +7,33 @@ from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
 import datetime
 
-load_dotenv()
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 引擎在第一次使用时才创建并绑定到会话工厂，导入本模块不会读取环境变量或连接数据库
+_engine = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+def get_engine():
+    """返回全局引擎，第一次调用时根据 DATABASE_URL 创建。"""
+    global _engine
+    if _engine is None:
+        load_dotenv()
+        _engine = create_engine(os.getenv("DATABASE_URL"))
+        _session_factory.configure(bind=_engine)
+    return _engine
+
+def dispose_engine():
+    """释放连接池，供 API 关闭时调用。"""
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+def SessionLocal():
+    """创建一个新会话；保持与原先 sessionmaker 相同的调用方式。"""
+    get_engine()
+    return _session_factory()
+
 class GameOpportunity(Base):
     __tablename__ = "game_opportunities"
     app_id = Column(Integer, primary_key=True, index=True)
@@ -33,6 +54,15 @@ class SteamGame(Base):
     total_reviews_all_purchase_types = Column(Integer, default=0)
     total_reviews_steam_purchase_only = Column(Integer, default=0)
 
+class ReviewSnapshot(Base):
+    # 评测数历史：只在数值变化时追加一行，存储量取决于变化次数而不是扫描次数。
+    # 不使用自增 id，复合主键本身就是唯一的索引，按 (游戏, 语言, 时间) 查询都走它。
+    __tablename__ = "review_history"
+    app_id = Column(Integer, primary_key=True)
+    language = Column(String(16), primary_key=True) # 语言代码，或 history.py 中的总评测数伪代码
+    recorded_at = Column(DateTime, primary_key=True)
+    review_count = Column(Integer, nullable=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -42,4 +72,4 @@ def get_db():
         db.close()
 
 def create_db_and_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=get_engine())
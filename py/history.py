@@ -0,0 +1,264 @@
+# history.py
+import argparse
+import datetime
+from sqlalchemy import select, delete, exists, func, and_, case, literal, DateTime
+from sqlalchemy.orm import Session, aliased
+from database import SessionLocal, SteamGame, ReviewSnapshot
+
+# 总评测数在历史表中使用的伪语言代码
+TOTAL_ALL_PURCHASE_KEY = "_all"
+TOTAL_STEAM_PURCHASE_KEY = "_steam"
+
+# 超过这个天数的快照会被 compact_history 压缩为每月一条
+COMPACT_AFTER_DAYS = 90
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """review_history.recorded_at 是不带时区的列，统一按 UTC 存储和比较。"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _iso_utc(value: datetime.datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.isoformat()
+
+
+def get_latest_counts(db: Session, app_id: int) -> dict[str, int]:
+    """返回某个游戏每种语言最近一次记录的评测数。"""
+    latest = db.query(
+        ReviewSnapshot.language,
+        func.max(ReviewSnapshot.recorded_at).label("recorded_at")
+    ).filter(ReviewSnapshot.app_id == app_id).group_by(ReviewSnapshot.language).subquery()
+
+    rows = db.query(ReviewSnapshot.language, ReviewSnapshot.review_count).join(
+        latest,
+        and_(
+            ReviewSnapshot.language == latest.c.language,
+            ReviewSnapshot.recorded_at == latest.c.recorded_at
+        )
+    ).filter(ReviewSnapshot.app_id == app_id).all()
+    return {language: count for language, count in rows}
+
+
+def record_review_counts(db: Session, app_id: int, counts: dict[str, int | None], recorded_at: datetime.datetime | None = None) -> int:
+    """
+    将本次扫描得到的评测数与最近一次快照比较，只为发生变化的语言追加新行；
+    值为 None（获取失败）的语言会被跳过。
+    返回新增的快照数量。调用方负责 commit。
+    """
+    if not counts:
+        return 0
+    recorded_at = _naive_utc(recorded_at or datetime.datetime.now(datetime.timezone.utc))
+    latest = get_latest_counts(db, app_id)
+
+    added = 0
+    for language, count in counts.items():
+        if count is None or latest.get(language) == count:
+            continue
+        db.add(ReviewSnapshot(app_id=app_id, language=language, recorded_at=recorded_at, review_count=count))
+        added += 1
+    return added
+
+
+def _pick_snapshots(db: Session, language: str, time_filter, pick, app_ids=None):
+    """
+    构造一个子查询：每个游戏在满足 time_filter 的快照中，按 pick（func.max 或 func.min）
+    选出的那一条快照的评测数及其时间。
+    """
+    picked_query = db.query(
+        ReviewSnapshot.app_id,
+        pick(ReviewSnapshot.recorded_at).label("recorded_at")
+    ).filter(ReviewSnapshot.language == language, time_filter)
+    if app_ids is not None:
+        picked_query = picked_query.filter(ReviewSnapshot.app_id.in_(app_ids))
+    picked = picked_query.group_by(ReviewSnapshot.app_id).subquery()
+
+    return db.query(
+        ReviewSnapshot.app_id.label("app_id"),
+        ReviewSnapshot.review_count.label("review_count"),
+        ReviewSnapshot.recorded_at.label("recorded_at")
+    ).join(
+        picked,
+        and_(
+            ReviewSnapshot.app_id == picked.c.app_id,
+            ReviewSnapshot.recorded_at == picked.c.recorded_at
+        )
+    ).filter(ReviewSnapshot.language == language).subquery()
+
+
+def _counts_at(db: Session, language: str, at: datetime.datetime, app_ids=None):
+    """每个游戏在时间点 at 之前（含）最近一次快照的评测数。"""
+    return _pick_snapshots(db, language, ReviewSnapshot.recorded_at <= _naive_utc(at), func.max, app_ids)
+
+
+def _first_counts_in(db: Session, language: str, start: datetime.datetime, end: datetime.datetime, app_ids=None):
+    """每个游戏在 (start, end] 窗口内第一次快照的评测数。"""
+    time_filter = and_(ReviewSnapshot.recorded_at > _naive_utc(start), ReviewSnapshot.recorded_at <= _naive_utc(end))
+    return _pick_snapshots(db, language, time_filter, func.min, app_ids)
+
+
+def _growth_summary(start_count: int | None, end_count: int | None, start: datetime.datetime, end: datetime.datetime) -> dict:
+    if start_count is None or end_count is None:
+        delta = None
+    else:
+        delta = end_count - start_count
+    days = max((end - start).total_seconds() / 86400, 1e-9)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "start_count": start_count,
+        "end_count": end_count,
+        "delta": delta,
+        "per_day": round(delta / days, 4) if delta is not None else None,
+        "growth_ratio": round(delta / start_count, 4) if delta is not None and start_count else None,
+    }
+
+
+def get_app_growth(db: Session, app_id: int, language: str, start: datetime.datetime, end: datetime.datetime) -> dict:
+    """
+    计算单个游戏在 [start, end] 窗口内某种语言的评测增长。
+    基线取 start 之前最近的快照；若没有，则取窗口内的第一次快照（此时 baseline_at 晚于 start）。
+    窗口结束前完全没有快照时，start_count 和 delta 为 None。
+    """
+    baseline_at = start
+    start_row = db.query(_counts_at(db, language, start, app_ids=[app_id])).first()
+    if start_row is None:
+        start_row = db.query(_first_counts_in(db, language, start, end, app_ids=[app_id])).first()
+        if start_row is not None:
+            baseline_at = start_row.recorded_at
+    end_row = db.query(_counts_at(db, language, end, app_ids=[app_id])).first()
+
+    if start_row is None:
+        summary = _growth_summary(None, end_row.review_count if end_row else None, start, end)
+        baseline_at = None
+    else:
+        # 基线晚于 start 时，按基线到 end 的实际时长计算每日增长
+        summary = _growth_summary(start_row.review_count, end_row.review_count, _naive_utc(baseline_at), _naive_utc(end))
+        summary["start"] = start.isoformat()
+        summary["end"] = end.isoformat()
+    summary.update({
+        "app_id": app_id,
+        "language": language,
+        "baseline_at": _iso_utc(baseline_at),
+    })
+    return summary
+
+
+def get_cohort_growth(db: Session, tags: list[str], language: str, start: datetime.datetime, end: datetime.datetime, top_n: int = 10) -> dict:
+    """
+    计算标签群组（与给定标签有交集的所有游戏）在窗口内的评测增长，
+    并返回增长最快的前 top_n 个游戏。
+    每个游戏的基线取 start 之前最近的快照；若没有，则取窗口内的第一次快照，
+    这样首次出现在历史中的游戏不会把全部评测数计为增长。
+    群组的 per_day 是各游戏按自身基线（baseline_at）到 end 计算的每日增长之和，
+    与 get_app_growth 的口径一致；growth_ratio 则基于各基线评测数之和。
+    """
+    cohort_ids = select(SteamGame.app_id).where(
+        SteamGame.type.in_(['game', 'demo']),
+        SteamGame.tags.isnot(None),
+        SteamGame.tags != '',
+        func.string_to_array(SteamGame.tags, ',').op('&&')(tags)
+    )
+    start_counts = _counts_at(db, language, start, app_ids=cohort_ids)
+    first_counts = _first_counts_in(db, language, start, end, app_ids=cohort_ids)
+    end_counts = _counts_at(db, language, end, app_ids=cohort_ids)
+
+    # end_counts 中的每个游戏在窗口结束前至少有一次快照，所以两者之一必然存在
+    baseline_col = func.coalesce(start_counts.c.review_count, first_counts.c.review_count)
+    baseline_at_col = case(
+        (start_counts.c.app_id.isnot(None), literal(_naive_utc(start), DateTime)),
+        else_=first_counts.c.recorded_at
+    )
+    delta_col = end_counts.c.review_count - baseline_col
+    seconds_col = func.extract('epoch', literal(_naive_utc(end), DateTime) - baseline_at_col)
+    per_app = db.query(
+        end_counts.c.app_id,
+        baseline_col.label("start_count"),
+        end_counts.c.review_count.label("end_count"),
+        delta_col.label("delta"),
+        baseline_at_col.label("baseline_at"),
+        (delta_col * 86400.0 / func.nullif(seconds_col, 0)).label("per_day")
+    ).outerjoin(
+        start_counts, start_counts.c.app_id == end_counts.c.app_id
+    ).outerjoin(
+        first_counts, first_counts.c.app_id == end_counts.c.app_id
+    ).subquery()
+
+    totals = db.query(
+        func.count(per_app.c.app_id),
+        func.coalesce(func.sum(per_app.c.start_count), 0),
+        func.coalesce(func.sum(per_app.c.end_count), 0),
+        func.coalesce(func.sum(per_app.c.per_day), 0)
+    ).one()
+    app_count, start_total, end_total, per_day_total = totals
+
+    top_rows = db.query(
+        per_app.c.app_id, SteamGame.name, per_app.c.start_count, per_app.c.end_count,
+        per_app.c.delta, per_app.c.baseline_at, per_app.c.per_day
+    ).join(
+        SteamGame, SteamGame.app_id == per_app.c.app_id
+    ).order_by(per_app.c.delta.desc()).limit(top_n).all()
+
+    summary = _growth_summary(int(start_total), int(end_total), start, end)
+    summary.update({
+        "per_day": round(float(per_day_total), 4),
+        "tags": tags,
+        "language": language,
+        "app_count": app_count,
+        "top_growers": [
+            {
+                "app_id": r[0], "name": r[1], "start_count": r[2], "end_count": r[3], "delta": r[4],
+                "baseline_at": _iso_utc(r[5]),
+                "per_day": round(float(r[6]), 4) if r[6] is not None else None,
+            }
+            for r in top_rows
+        ],
+    })
+    return summary
+
+
+def compact_history(db: Session, keep_days: int = COMPACT_AFTER_DAYS, now: datetime.datetime | None = None) -> int:
+    """
+    将早于截止月份的快照压缩为每个 (游戏, 语言, 月份) 只保留当月最后一条。
+    截止点取 keep_days 天前所在月份的第一天，因此不会拆开一个月。
+    增长查询取的是"某时间点之前最近的快照"，所以月末数值保持不变。
+    返回删除的行数。调用方负责 commit。
+    """
+    now = _naive_utc(now or datetime.datetime.now(datetime.timezone.utc))
+    cutoff = (now - datetime.timedelta(days=keep_days)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    later = aliased(ReviewSnapshot)
+    month = func.date_trunc('month', ReviewSnapshot.recorded_at)
+    has_later_in_month = exists().where(
+        later.app_id == ReviewSnapshot.app_id,
+        later.language == ReviewSnapshot.language,
+        later.recorded_at > ReviewSnapshot.recorded_at,
+        later.recorded_at < cutoff,
+        func.date_trunc('month', later.recorded_at) == month
+    )
+    result = db.execute(
+        delete(ReviewSnapshot).where(ReviewSnapshot.recorded_at < cutoff, has_later_in_month)
+    )
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="压缩评测数历史：旧快照每月只保留最后一条。")
+    parser.add_argument("--keep-days", type=int, default=COMPACT_AFTER_DAYS, help="最近多少天内的快照保持原样。")
+    args = parser.parse_args()
+
+    db: Session = SessionLocal()
+    try:
+        deleted = compact_history(db, keep_days=args.keep_days)
+        db.commit()
+        print(f"历史压缩完成，删除了 {deleted} 条快照。")
+    except Exception as e:
+        print(f"压缩历史时发生错误: {e}")
+        db.rollback()
+    finally:
+        db.close()
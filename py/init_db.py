@@ -0,0 +1,8 @@
+# init_db.py
+# 显式的建表步骤：部署时运行一次，API 进程启动时不再执行任何DDL
+from database import create_db_and_tables
+
+if __name__ == "__main__":
+    print("正在检查并创建数据库表（如果不存在）...")
+    create_db_and_tables()
+    print("数据库表检查完成。")
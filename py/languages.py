@@ -0,0 +1,22 @@
+# languages.py
+# 轻量的语言常量模块，不依赖数据库或网络，可被 API 和扫描器共同导入
+
+CORE_LANGUAGES = ["schinese", "japanese", "french", "koreana"]
+ALL_STEAM_LANGUAGES = [
+    "arabic", "bulgarian", "schinese", "tchinese", "czech", "danish", "dutch",
+    "english", "finnish", "french", "german", "greek", "hungarian", "indonesian",
+    "italian", "japanese", "koreana", "norwegian", "polish", "portuguese",
+    "brazilian", "romanian", "russian", "spanish", "latam", "swedish", "thai",
+    "turkish", "ukrainian", "vietnamese"
+]
+
+# Steam 语言代码 -> supported_languages 字段中使用的英文全称
+LANGUAGE_CODE_TO_NAME = {
+    "schinese": "Simplified Chinese", "tchinese": "Traditional Chinese", "japanese": "Japanese", "koreana": "Korean",
+    "thai": "Thai", "bulgarian": "Bulgarian", "czech": "Czech", "danish": "Danish", "german": "German",
+    "spanish": "Spanish - Spain", "latam": "Spanish - Latin America", "greek": "Greek", "french": "French",
+    "italian": "Italian", "indonesian": "Indonesian", "hungarian": "Hungarian", "dutch": "Dutch", "norwegian": "Norwegian",
+    "polish": "Polish", "portuguese": "Portuguese - Portugal", "brazilian": "Portuguese - Brazil", "romanian": "Romanian",
+    "russian": "Russian", "finnish": "Finnish", "swedish": "Swedish", "turkish": "Turkish", "vietnamese": "Vietnamese",
+    "ukrainian": "Ukrainian", "english": "English", "arabic": "Arabic"
+}
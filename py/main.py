@@ -6,23 +6,28 @@ import datetime
 import json
 import time
 import traceback
+from contextlib import asynccontextmanager
 import requests
-from dotenv import load_dotenv
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import func, or_, desc
 
-from database import get_db, SteamGame, create_db_and_tables
-from scanner import process_single_game, ALL_STEAM_LANGUAGES, CORE_LANGUAGES
+from database import get_db, get_engine, dispose_engine, SteamGame
+from languages import ALL_STEAM_LANGUAGES, CORE_LANGUAGES, LANGUAGE_CODE_TO_NAME
+from history import get_app_growth, get_cohort_growth
 
-# 确保在程序开始时加载环境变量
-load_dotenv()
-create_db_and_tables()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 只创建引擎（不连接、不执行DDL）；建表请单独运行 `python init_db.py`
+    get_engine()
+    yield
+    dispose_engine()
 
 app = FastAPI(
     title="Indie Game Localization Opportunity Finder",
-    description="一个用于分析Steam游戏本地化潜力的API"
+    description="一个用于分析Steam游戏本地化潜力的API",
+    lifespan=lifespan
 )
 
 # CORS (跨域资源共享) 设置，允许前端访问
@@ -63,6 +68,8 @@ def get_languages(full_list: bool = False):
 
 def update_games_on_demand(app_ids: list[int], language: str, db: Session, api_key: str):
     """使用用户的API Key按需更新指定游戏和语言的数据。"""
+    # 扫描器只在按需更新时才需要，延迟导入以加快 API 启动
+    from scanner import process_single_game
     print(f"--- 即时更新任务启动 (使用用户Key): 语言 '{language}', AppIDs: {app_ids} ---")
     for app_id in app_ids:
         game = db.query(SteamGame).filter(SteamGame.app_id == app_id).first()
@@ -88,6 +95,45 @@ def search_games(query: str, db: Session = Depends(get_db)):
     
     return [{"name": g.name, "appid": g.app_id} for g in found_games]
 
+MAX_WINDOW_DAYS = 3650
+
+def resolve_window(days: int, end: datetime.datetime | None) -> tuple[datetime.datetime, datetime.datetime]:
+    """把 (天数, 结束时间) 转换为 [start, end] 时间窗口。"""
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="时间窗口天数必须大于0。")
+    end = end or datetime.datetime.now(datetime.timezone.utc)
+    try:
+        return end - datetime.timedelta(days=days), end
+    except OverflowError:
+        raise HTTPException(status_code=400, detail="时间窗口超出了可表示的日期范围。")
+
+@app.get("/growth/{app_id}", response_model=dict)
+def growth_by_app(
+    app_id: int,
+    language: str = Query("_all", description="语言代码；'_all' 表示总评测数。"),
+    days: int = Query(30, gt=0, le=MAX_WINDOW_DAYS, description="时间窗口长度（天）。"),
+    end: datetime.datetime | None = Query(None, description="窗口结束时间，默认为当前时间。"),
+    db: Session = Depends(get_db)
+):
+    """返回单个游戏在指定时间窗口内的评测增长。"""
+    start, end = resolve_window(days, end)
+    return get_app_growth(db, app_id, language, start, end)
+
+@app.get("/growth_by_tags", response_model=dict)
+def growth_by_tags(
+    tags: str = Query(..., description="标签列表，用逗号或分号分隔。"),
+    language: str = Query("_all", description="语言代码；'_all' 表示总评测数。"),
+    days: int = Query(30, gt=0, le=MAX_WINDOW_DAYS, description="时间窗口长度（天）。"),
+    end: datetime.datetime | None = Query(None, description="窗口结束时间，默认为当前时间。"),
+    db: Session = Depends(get_db)
+):
+    """返回标签群组在指定时间窗口内的评测增长，以及增长最快的游戏。"""
+    user_tags = [t.strip() for t in tags.replace(';', ',').split(',') if t.strip()]
+    if not user_tags:
+        raise HTTPException(status_code=400, detail="输入的标签列表为空，请至少提供一个标签。")
+    start, end = resolve_window(days, end)
+    return get_cohort_growth(db, user_tags, language, start, end)
+
 @app.get("/analyze_by_tags", response_model=dict)
 def analyze_by_tags(
     tags: str = Query(..., description="用户输入的标签，用逗号或分号分隔。"),
@@ -103,16 +149,7 @@ def analyze_by_tags(
     if not user_tags:
         raise HTTPException(status_code=400, detail="输入的标签列表为空，请至少提供一个标签。")
 
-    lang_code_to_name_map = {
-        "schinese": "Simplified Chinese", "tchinese": "Traditional Chinese", "japanese": "Japanese", "koreana": "Korean",
-        "thai": "Thai", "bulgarian": "Bulgarian", "czech": "Czech", "danish": "Danish", "german": "German",
-        "spanish": "Spanish - Spain", "latam": "Spanish - Latin America", "greek": "Greek", "french": "French",
-        "italian": "Italian", "indonesian": "Indonesian", "hungarian": "Hungarian", "dutch": "Dutch", "norwegian": "Norwegian",
-        "polish": "Polish", "portuguese": "Portuguese - Portugal", "brazilian": "Portuguese - Brazil", "romanian": "Romanian",
-        "russian": "Russian", "finnish": "Finnish", "swedish": "Swedish", "turkish": "Turkish", "vietnamese": "Vietnamese",
-        "ukrainian": "Ukrainian", "english": "English", "arabic": "Arabic"
-    }
-    language_fullname_for_query = lang_code_to_name_map.get(language, language)
+    language_fullname_for_query = LANGUAGE_CODE_TO_NAME.get(language, language)
 
     base_comparison_query = db.query(SteamGame).filter(
         SteamGame.type.in_(['game', 'demo']),
@@ -168,16 +205,7 @@ def analyze_game_v2(
     user_api_key: str | None = None
 ):
     """核心分析接口，支持默认模式和使用用户Key的实时模式。"""
-    lang_code_to_name_map = {
-        "schinese": "Simplified Chinese", "tchinese": "Traditional Chinese", "japanese": "Japanese", "koreana": "Korean",
-        "thai": "Thai", "bulgarian": "Bulgarian", "czech": "Czech", "danish": "Danish", "german": "German",
-        "spanish": "Spanish - Spain", "latam": "Spanish - Latin America", "greek": "Greek", "french": "French",
-        "italian": "Italian", "indonesian": "Indonesian", "hungarian": "Hungarian", "dutch": "Dutch", "norwegian": "Norwegian",
-        "polish": "Polish", "portuguese": "Portuguese - Portugal", "brazilian": "Portuguese - Brazil", "romanian": "Romanian",
-        "russian": "Russian", "finnish": "Finnish", "swedish": "Swedish", "turkish": "Turkish", "vietnamese": "Vietnamese",
-        "ukrainian": "Ukrainian", "english": "English", "arabic": "Arabic"
-    }
-    language_fullname_for_query = lang_code_to_name_map.get(language, language)
+    language_fullname_for_query = LANGUAGE_CODE_TO_NAME.get(language, language)
 
     try:
         if not user_api_key and language not in CORE_LANGUAGES:
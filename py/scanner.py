@@ -6,19 +6,13 @@ import json
 import re
 from sqlalchemy.orm import Session
 from database import SessionLocal, SteamGame, create_db_and_tables
+from history import record_review_counts, TOTAL_ALL_PURCHASE_KEY, TOTAL_STEAM_PURCHASE_KEY
+from languages import ALL_STEAM_LANGUAGES, CORE_LANGUAGES
 
 # ... (顶部的常量等保持不变) ...
 STEAM_API_URL = "https://store.steampowered.com/api/appdetails"
 REVIEW_API_URL = "https://store.steampowered.com/appreviews"
 REQUEST_DELAY = 1.5
-CORE_LANGUAGES = ["schinese", "japanese", "french", "koreana"]
-ALL_STEAM_LANGUAGES = [
-    "arabic", "bulgarian", "schinese", "tchinese", "czech", "danish", "dutch",
-    "english", "finnish", "french", "german", "greek", "hungarian", "indonesian",
-    "italian", "japanese", "koreana", "norwegian", "polish", "portuguese",
-    "brazilian", "romanian", "russian", "spanish", "latam", "swedish", "thai",
-    "turkish", "ukrainian", "vietnamese"
-]
 
 def get_app_details_with_retry(app_id: int, max_retries=3):
     params = {'appids': app_id, 'l': 'english'}
@@ -60,6 +54,7 @@ def parse_tags(genres: list, categories: list):
     return ",".join(filter(None, tags))
 
 def get_review_count(app_id: int, language: str, purchase_type: str, api_key: str | None = None):
+    """返回评测数；请求失败时返回 None，以免把失败当成真实的 0 写入数据库和历史。"""
     params = {'json': 1, 'language': language, 'purchase_type': purchase_type}
     try:
         response = requests.get(f"{REVIEW_API_URL}/{app_id}", params=params, timeout=10)
@@ -67,12 +62,13 @@ def get_review_count(app_id: int, language: str, purchase_type: str, api_key: st
             data = response.json()
             if data and data.get('success') == 1:
                 return data.get('query_summary', {}).get('total_reviews', 0)
-        return 0
+        return None
     except requests.exceptions.RequestException:
-        return 0
+        return None
 
 def process_single_game(game: SteamGame, db: Session, languages_to_scan: list[str] | None = None, force_details_update: bool = False, api_key: str | None = None):
     print(f"--> 开始处理 AppID: {game.app_id} ({game.name})")
+    scanned_counts = {}
 
     if force_details_update or not game.last_scanned:
         print("  - 正在更新游戏基本详情...")
@@ -98,9 +94,16 @@ def process_single_game(game: SteamGame, db: Session, languages_to_scan: list[st
         game.tags = parse_tags(app_data.get('genres', []), app_data.get('categories', []))
         print(f"  - AppID {game.app_id} 详情解析完成！")
 
-        game.total_reviews_all_purchase_types = get_review_count(game.app_id, 'all', 'all', api_key=api_key)
+        total_all = get_review_count(game.app_id, 'all', 'all', api_key=api_key)
         time.sleep(0.2)
-        game.total_reviews_steam_purchase_only = get_review_count(game.app_id, 'all', 'steam', api_key=api_key)
+        total_steam = get_review_count(game.app_id, 'all', 'steam', api_key=api_key)
+        # 获取失败（None）时保留上一次的值
+        if total_all is not None:
+            game.total_reviews_all_purchase_types = total_all
+        if total_steam is not None:
+            game.total_reviews_steam_purchase_only = total_steam
+        scanned_counts[TOTAL_ALL_PURCHASE_KEY] = total_all
+        scanned_counts[TOTAL_STEAM_PURCHASE_KEY] = total_steam
         print(f"  - 总评测数更新完毕: {game.total_reviews_all_purchase_types}")
     
     scan_list = languages_to_scan if languages_to_scan is not None else CORE_LANGUAGES
@@ -116,10 +119,17 @@ def process_single_game(game: SteamGame, db: Session, languages_to_scan: list[st
               continue
           print(f"    - 正在获取 {lang_code} 评测...")
           review_count = get_review_count(game.app_id, lang_code, 'all', api_key=api_key)
-          existing_reviews[lang_code] = review_count
+          if review_count is None:
+              print(f"    - {lang_code} 评测获取失败，保留原有数据。")
+          else:
+              existing_reviews[lang_code] = review_count
+              scanned_counts[lang_code] = review_count
           time.sleep(REQUEST_DELAY)
 
       game.language_reviews = json.dumps(existing_reviews)
+
+    # 只有数值变化时才会追加历史快照（获取失败的 None 会被跳过）
+    record_review_counts(db, game.app_id, scanned_counts)
     
     game.last_scanned = datetime.datetime.now(datetime.timezone.utc)
     print(f"  - AppID {game.app_id} 处理完成，时间戳已更新。")